@@ -18,8 +18,6 @@ uv run pyinstaller --noconfirm ^
     --add-data "SimConnect;SimConnect" ^
     --add-binary "SimConnect\SimConnect.dll;SimConnect" ^
     --add-data "fonts;fonts" ^
-    --hidden-import "winshell" ^
-    --hidden-import "win32com.client" ^
     --hidden-import "SimConnect" ^
     mini_gui.py
 
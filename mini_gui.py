@@ -1,11 +1,179 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from tkinter import font as tkfont
-import threading, time, sys, os, ctypes, json
+import threading, sys, os, ctypes, json, functools, re, subprocess, queue
+from collections import namedtuple
+from ctypes import wintypes
 from loguru import logger
 from SimConnect import AircraftRequests, SimConnect, AircraftEvents
 
+# WinEvent hook: get notified of foreground window changes instead of polling
+EVENT_SYSTEM_FOREGROUND = 0x0003
+WINEVENT_OUTOFCONTEXT = 0x0000
+WinEventProcType = ctypes.WINFUNCTYPE(
+    None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND,
+    wintypes.LONG, wintypes.LONG, wintypes.DWORD, wintypes.DWORD)
+
+# Win32 functions bound once with explicit prototypes (no per-call lookup / guessing).
+# Windows-only module: a missing user32 / gdi32 fails the import, not individual calls
+_user32 = ctypes.WinDLL("user32", use_last_error=True)
+_gdi32 = ctypes.WinDLL("gdi32", use_last_error=True)
+
+_GetForegroundWindow = _user32.GetForegroundWindow
+_GetForegroundWindow.argtypes = []
+_GetForegroundWindow.restype = wintypes.HWND
+
+_GetWindowTextW = _user32.GetWindowTextW
+_GetWindowTextW.argtypes = [wintypes.HWND, wintypes.LPWSTR, ctypes.c_int]
+_GetWindowTextW.restype = ctypes.c_int
+
+_GetWindowThreadProcessId = _user32.GetWindowThreadProcessId
+_GetWindowThreadProcessId.argtypes = [wintypes.HWND, ctypes.POINTER(wintypes.DWORD)]
+_GetWindowThreadProcessId.restype = wintypes.DWORD
+
+_SetWinEventHook = _user32.SetWinEventHook
+_SetWinEventHook.argtypes = [wintypes.DWORD, wintypes.DWORD, wintypes.HMODULE, WinEventProcType,
+                             wintypes.DWORD, wintypes.DWORD, wintypes.DWORD]
+_SetWinEventHook.restype = wintypes.HANDLE
+
+_UnhookWinEvent = _user32.UnhookWinEvent
+_UnhookWinEvent.argtypes = [wintypes.HANDLE]
+_UnhookWinEvent.restype = wintypes.BOOL
+
+_AddFontResourceExW = _gdi32.AddFontResourceExW
+_AddFontResourceExW.argtypes = [wintypes.LPCWSTR, wintypes.DWORD, ctypes.c_void_p]
+_AddFontResourceExW.restype = ctypes.c_int
+
+# Startup shortcut target / arguments, fixed for the lifetime of the process
+_FROZEN = getattr(sys, 'frozen', False)
+_SCRIPT_ABSPATH = os.path.abspath(__file__)
+_STARTUP_TARGET = sys.executable
+_STARTUP_ARGS = "--startup" if _FROZEN else f'"{_SCRIPT_ABSPATH}" --startup'
+_WORKDIR = os.path.dirname(_STARTUP_TARGET)
+_STARTUP_DIR = os.path.join(os.environ["APPDATA"], r"Microsoft\Windows\Start Menu\Programs\Startup")
+_LNK_PATH = os.path.join(_STARTUP_DIR, "MSFS-SimRateMonitor.lnk")
+CREATE_NO_WINDOW = 0x08000000  # subprocess creationflags: no console for PowerShell
+SHORTCUT_PS_TIMEOUT = 30  # Seconds before a stuck PowerShell fallback is given up on
+
+# PowerShell fallback for the startup shortcut, run with -File instead of -Command
+_SHORTCUT_PS1 = """param($LnkPath, $Target, $Arguments)
+$s = (New-Object -ComObject WScript.Shell).CreateShortcut($LnkPath)
+$s.TargetPath = $Target
+$s.Arguments = $Arguments
+$s.Save()
+"""
+
+@functools.lru_cache(maxsize=1)
+def _shortcut_script_path():
+    """Write the shortcut .ps1 next to config.json (unless already up to date), return its path"""
+    # Our own %APPDATA% folder, not the shared %TEMP%: the script runs with -ExecutionPolicy Bypass
+    path = os.path.join(os.path.dirname(get_config_path()), "make_lnk.ps1")
+    try:
+        with open(path, "r") as f:
+            current = f.read()
+    except OSError:
+        current = None
+    if current != _SHORTCUT_PS1:
+        with open(path, "w") as f:
+            f.write(_SHORTCUT_PS1)
+    return path
+
+# ---- Startup shortcut via IShellLinkW / IPersistFile, called straight through the vtable ----
+class _GUID(ctypes.Structure):
+    _fields_ = [("Data1", wintypes.DWORD), ("Data2", wintypes.WORD),
+                ("Data3", wintypes.WORD), ("Data4", ctypes.c_ubyte * 8)]
+
+CLSCTX_INPROC_SERVER = 0x1
+STGM_READ = 0x0
+SLGP_RAWPATH = 0x4
+_LINK_BUF_LEN = 1024  # INFOTIPSIZE, the longest string a shell link field holds
+_CLSID_ShellLink = "{00021401-0000-0000-C000-000000000046}"
+_IID_IShellLinkW = "{000214F9-0000-0000-C000-000000000046}"
+_IID_IPersistFile = "{0000010B-0000-0000-C000-000000000046}"
+
+@functools.lru_cache(maxsize=1)
+def _ole32():
+    """Bind ole32 on first use: only "Start with Windows" needs COM, a failure here must not stop startup"""
+    ole32 = ctypes.OleDLL("ole32")  # OleDLL raises OSError on failing HRESULTs
+    ole32.CoInitialize.argtypes = [ctypes.c_void_p]
+    ole32.CoUninitialize.argtypes = []
+    ole32.CoUninitialize.restype = None
+    ole32.CLSIDFromString.argtypes = [wintypes.LPCWSTR, ctypes.POINTER(_GUID)]
+    ole32.CoCreateInstance.argtypes = [ctypes.POINTER(_GUID), ctypes.c_void_p, wintypes.DWORD,
+                                       ctypes.POINTER(_GUID), ctypes.POINTER(ctypes.c_void_p)]
+    return ole32
+
+@functools.lru_cache(maxsize=None)
+def _guid(text):
+    guid = _GUID()
+    _ole32().CLSIDFromString(text, ctypes.byref(guid))
+    return guid
+
+# COM methods: (vtable index, name); the first call argument is the interface pointer
+_IUnknown_QueryInterface = ctypes.WINFUNCTYPE(
+    ctypes.HRESULT, ctypes.POINTER(_GUID), ctypes.POINTER(ctypes.c_void_p))(0, "QueryInterface")
+_IUnknown_Release = ctypes.WINFUNCTYPE(wintypes.ULONG)(2, "Release")
+_IShellLinkW_GetPath = ctypes.WINFUNCTYPE(
+    ctypes.HRESULT, wintypes.LPWSTR, ctypes.c_int, ctypes.c_void_p, wintypes.DWORD)(3, "GetPath")
+_IShellLinkW_GetWorkingDirectory = ctypes.WINFUNCTYPE(ctypes.HRESULT, wintypes.LPWSTR, ctypes.c_int)(8, "GetWorkingDirectory")
+_IShellLinkW_GetArguments = ctypes.WINFUNCTYPE(ctypes.HRESULT, wintypes.LPWSTR, ctypes.c_int)(10, "GetArguments")
+_IShellLinkW_SetWorkingDirectory = ctypes.WINFUNCTYPE(ctypes.HRESULT, wintypes.LPCWSTR)(9, "SetWorkingDirectory")
+_IShellLinkW_SetArguments = ctypes.WINFUNCTYPE(ctypes.HRESULT, wintypes.LPCWSTR)(11, "SetArguments")
+_IShellLinkW_SetIconLocation = ctypes.WINFUNCTYPE(ctypes.HRESULT, wintypes.LPCWSTR, ctypes.c_int)(17, "SetIconLocation")
+_IShellLinkW_SetPath = ctypes.WINFUNCTYPE(ctypes.HRESULT, wintypes.LPCWSTR)(20, "SetPath")
+_IPersistFile_Load = ctypes.WINFUNCTYPE(ctypes.HRESULT, wintypes.LPCWSTR, wintypes.DWORD)(5, "Load")
+_IPersistFile_Save = ctypes.WINFUNCTYPE(ctypes.HRESULT, wintypes.LPCWSTR, wintypes.BOOL)(6, "Save")
+
+def _shortcut_matches(link, persist, lnk, target, arguments, workdir):
+    """Load an existing .lnk into link and compare it with the wanted fields"""
+    try:
+        _IPersistFile_Load(persist, lnk, STGM_READ)
+    except OSError:
+        return False  # Missing or unreadable: (re)write it
+    buf = ctypes.create_unicode_buffer(_LINK_BUF_LEN)
+    _IShellLinkW_GetPath(link, buf, _LINK_BUF_LEN, None, SLGP_RAWPATH)
+    if os.path.normcase(buf.value) != os.path.normcase(target):
+        return False
+    _IShellLinkW_GetArguments(link, buf, _LINK_BUF_LEN)
+    if buf.value != arguments:
+        return False
+    _IShellLinkW_GetWorkingDirectory(link, buf, _LINK_BUF_LEN)
+    return os.path.normcase(buf.value) == os.path.normcase(workdir)
+
+def _create_shortcut(lnk, target, arguments, workdir, icon):
+    """Write a .lnk file unless an identical one exists; returns True if written, raises OSError on failure"""
+    ole32 = _ole32()
+    try:
+        ole32.CoInitialize(None)
+        initialized = True  # S_OK / S_FALSE both need a matching CoUninitialize
+    except OSError:
+        initialized = False  # Already initialized in another apartment mode, still usable
+    link, persist = ctypes.c_void_p(), ctypes.c_void_p()
+    try:
+        ole32.CoCreateInstance(ctypes.byref(_guid(_CLSID_ShellLink)), None, CLSCTX_INPROC_SERVER,
+                               ctypes.byref(_guid(_IID_IShellLinkW)), ctypes.byref(link))
+        _IUnknown_QueryInterface(link, ctypes.byref(_guid(_IID_IPersistFile)), ctypes.byref(persist))
+        if _shortcut_matches(link, persist, lnk, target, arguments, workdir):
+            return False
+        _IShellLinkW_SetPath(link, target)
+        _IShellLinkW_SetArguments(link, arguments)
+        _IShellLinkW_SetWorkingDirectory(link, workdir)
+        _IShellLinkW_SetIconLocation(link, icon, 0)
+        _IPersistFile_Save(persist, lnk, True)
+        return True
+    finally:
+        if persist:
+            _IUnknown_Release(persist)
+        if link:
+            _IUnknown_Release(link)
+        if initialized:
+            ole32.CoUninitialize()
+
+# Parsed config.json, kept in memory after the first load
+_CONFIG_CACHE = None
+
 # Config file path
+@functools.lru_cache(maxsize=1)
 def get_config_path():
     """Get config file path in user's APPDATA"""
     appdata = os.environ.get("APPDATA", os.path.expanduser("~"))
@@ -14,18 +182,24 @@ def get_config_path():
     return os.path.join(config_dir, "config.json")
 
 def load_config():
-    """Load config from file"""
+    """Load config from file (read once, then served from memory)"""
+    global _CONFIG_CACHE
+    if _CONFIG_CACHE is not None:
+        return _CONFIG_CACHE
+    _CONFIG_CACHE = {}
     try:
         config_path = get_config_path()
         if os.path.exists(config_path):
             with open(config_path, "r") as f:
-                return json.load(f)
+                _CONFIG_CACHE = json.load(f)
     except Exception as e:
         logger.debug(f"Could not load config: {e}")
-    return {}
+    return _CONFIG_CACHE
 
 def save_config(config):
     """Save config to file"""
+    global _CONFIG_CACHE
+    _CONFIG_CACHE = config
     try:
         config_path = get_config_path()
         with open(config_path, "w") as f:
@@ -45,20 +219,25 @@ def load_custom_font():
         font_path = os.path.join(base_path, "fonts", "JetBrainsMono-Bold.ttf")
         if os.path.exists(font_path):
             # Windows: Add font resource temporarily
-            ctypes.windll.gdi32.AddFontResourceExW(font_path, 0x10, 0)  # FR_PRIVATE
+            _AddFontResourceExW(font_path, 0x10, None)  # FR_PRIVATE
             logger.info(f"Loaded custom font: {font_path}")
             return True
     except Exception as e:
         logger.debug(f"Could not load custom font: {e}")
     return False
 
-CUSTOM_FONT_LOADED = load_custom_font()
-OVERLAY_FONT = "JetBrains Mono" if CUSTOM_FONT_LOADED else "Consolas"
+# The font is registered off the main thread once the UI is up
+# (SimRateMonitor._init_late); the overlay starts in Consolas and switches over
+OVERLAY_FONT = "Consolas"
 
 
 # Configure loguru for detailed logging
 logger.remove()  # Remove default handler
 
+# Verbose tracing of the connect / focus loops; off by default so the f-strings
+# in those periodically-run paths are never built
+DEBUG_ENABLED = False
+
 # 只在有 stdout 时才添加控制台日志
 if sys.stdout is not None:
     logger.add(sys.stdout, 
@@ -70,7 +249,9 @@ if sys.stdout is not None:
             format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
             level="DEBUG", 
             rotation="1 MB", 
-            retention=1)       # 只保留 1 个文件（旧的自动删除）
+            retention=1,       # 只保留 1 个文件（旧的自动删除）
+            delay=True,        # 首条日志写入时才打开文件
+            enqueue=True)      # 文件写入交给 loguru 后台线程
 
 # =============== 主题（非夜间） ===============
 THEMES = {
@@ -101,104 +282,132 @@ THEMES = {
 CURRENT_THEME_NAME = "modern_light_gray"
 CURRENT_THEME = THEMES[CURRENT_THEME_NAME]
 
+# Window titles longer than this are truncated, which is fine for matching
+TITLE_BUF_LEN = 512
+# Foreground titles that count as MSFS, matched in a single pass
+_MSFS_TITLE_RE = re.compile("Microsoft Flight Simulator|FlightSimulator")
+
+# Sim rates MSFS steps through with SIM_RATE_INCR / SIM_RATE_DECR
+SIM_RATE_STEPS = (0.25, 0.5, 1, 2, 4, 8, 16, 32, 64, 128)
+
+# Polling cadences: SimConnect on the worker thread, focus fallback on the Tk thread
+SIM_RATE_POLL_INTERVAL = 0.25  # seconds
+FOCUS_POLL_INTERVAL_MS = 250
+
+# Interval of the periodic config flush; position changes only mark config dirty
+CONFIG_FLUSH_INTERVAL_MS = 5000
+
 # ---- helpers: 颜色混合，做选中/悬停底色 ----
+@functools.lru_cache(maxsize=None)
 def _hex_to_rgb(h):
     h = h.lstrip("#")
     return tuple(int(h[i:i+2], 16) for i in (0, 2, 4))
 
+@functools.lru_cache(maxsize=None)
 def _rgb_to_hex(rgb):
     return "#{:02X}{:02X}{:02X}".format(*rgb)
 
+@functools.lru_cache(maxsize=None)
 def _blend(c1, c2, t=0.85):
     r1,g1,b1 = _hex_to_rgb(c1); r2,g2,b2 = _hex_to_rgb(c2)
     r = int(r1*(1-t) + r2*t); g = int(g1*(1-t) + g2*t); b = int(b1*(1-t) + b2*t)
     return _rgb_to_hex((r,g,b))
 
+def _derive_segment_colors(theme):
+    """SegmentedRadio 颜色体系（在 accent 与 control_bg 之间做混色）"""
+    return {
+        "sel_bg": _blend(theme["accent"], theme["control_bg"], 0.82),  # 选中底
+        "sel_fg": theme["accent"],                                     # 选中文本
+        "hov_bg": _blend(theme["accent"], theme["control_bg"], 0.90),  # 悬停底
+        "nor_bg": theme["control_bg"],                                 # 常态底
+        "nor_fg": theme["fg"],                                         # 常态文本
+        "border": theme["divider"],
+    }
+
+_THEME_DERIVED = {name: _derive_segment_colors(t) for name, t in THEMES.items()}
+
+SEGMENT_FONT_NORMAL = ("Segoe UI", 10, "normal")
+SEGMENT_FONT_SELECTED = ("Segoe UI", 10, "bold")
+
+# ---- Overlay 尺寸：由 size_configs 预先推导出的窗口尺寸与字体 ----
+SizeSpec = namedtuple("SizeSpec", "width height font btn_font show_buttons")
+
+def _derive_size_spec(size, size_config):
+    font_size = size_config["font_size"]
+    # Adjust dimensions based on size and whether buttons are shown
+    show_buttons = size not in ["s"]  # No buttons for S size
+    return SizeSpec(
+        width=size_config["width"] + (45 if show_buttons else 0),
+        height=size_config["height"],
+        font=(OVERLAY_FONT, font_size, "bold"),
+        btn_font=(OVERLAY_FONT, max(10, font_size // 2)),
+        show_buttons=show_buttons,
+    )
+
 class SegmentedRadio(tk.Frame):
     """更现代的分段单选控件：选中高亮、悬停变浅、支持主题色"""
-    def __init__(self, parent, variable, options, theme, command=None, min_item_width=36, **kw):
+    # 每项是无指示器的 ttk.Radiobutton，选中/悬停样式交给 ttk state map
+    STYLE = "Segmented.TRadiobutton"
+
+    def __init__(self, parent, variable, options, theme=CURRENT_THEME_NAME, command=None,
+                 min_item_width=36, **kw):
         """
         options: [(value, text), ...]
         variable: tk.StringVar
-        theme: dict，使用你的 CURRENT_THEME
+        theme: THEMES 中的主题名，使用你的 CURRENT_THEME_NAME
         command: 回调（选项改变时）
         """
-        super().__init__(parent, bg=theme["control_bg"], **kw)
+        self.t = THEMES[theme]
+        super().__init__(parent, bg=self.t["control_bg"], **kw)
         self.var = variable
         self.options = options
-        self.t = theme
         self.command = command
-        self._labels = []
 
-        # 颜色体系（在 accent 与 control_bg 之间做混色）
-        self.sel_bg   = _blend(self.t["accent"], self.t["control_bg"], 0.82)  # 选中底
-        self.sel_fg   = self.t["accent"]                                      # 选中文本
-        self.hov_bg   = _blend(self.t["accent"], self.t["control_bg"], 0.90)  # 悬停底
-        self.nor_bg   = self.t["control_bg"]                                  # 常态底
-        self.nor_fg   = self.t["fg"]                                          # 常态文本
-        self.border   = self.t["divider"]
+        # 颜色体系（模块加载时已按主题预先计算）
+        colors = _THEME_DERIVED[theme]
+        self.sel_bg   = colors["sel_bg"]
+        self.sel_fg   = colors["sel_fg"]
+        self.hov_bg   = colors["hov_bg"]
+        self.nor_bg   = colors["nor_bg"]
+        self.nor_fg   = colors["nor_fg"]
+        self.border   = colors["border"]
+
+        self._configure_style()
 
         # 外层边框（形成胶囊容器）
         self.container = tk.Frame(self, bg=self.t["control_bg"], highlightthickness=1,
                                   highlightbackground=self.border, bd=0)
         self.container.pack(fill="x")
 
-        # 生成标签项
-        cols = len(self.options)
+        # 让每项最小宽度更协调：按最长文本统一宽度（字符数），无需逐项测量
+        max_text_len = max(len(t) for _, t in self.options)
+        item_width = max(max_text_len, int(min_item_width/7))
+
+        # 生成选项
         for i, (value, text) in enumerate(self.options):
             self.container.grid_columnconfigure(i, weight=1, uniform="seg")
-            cell = tk.Frame(self.container, bg=self.nor_bg)
-            cell.grid(row=0, column=i, sticky="nsew")
-
-            lbl = tk.Label(cell, text=text, bg=self.nor_bg, fg=self.nor_fg,
-                           font=("Segoe UI", 10, "bold" if self.var.get()==value else "normal"),
-                           padx=12, pady=6, cursor="hand2")
-            lbl.pack(fill="both", expand=True)
-            lbl.bind("<Button-1>", lambda e, v=value: self._on_click(v))
-            lbl.bind("<Enter>", lambda e, L=lbl: self._on_hover(L, True))
-            lbl.bind("<Leave>", lambda e, L=lbl: self._on_hover(L, False))
-
-            # 让每项最小宽度更协调
-            lbl.update_idletasks()
-            if lbl.winfo_width() < min_item_width:
-                lbl.config(width=int(min_item_width/7))
-
-            self._labels.append((value, lbl))
-
-        # 变量联动
-        self.var.trace_add("write", lambda *_: self._sync())
-        self._sync()
-
-    def _on_click(self, value):
-        if self.var.get() != value:
-            self.var.set(value)
-        if self.command:
-            self.command()
-
-    def _on_hover(self, lbl, entering):
-        value = None
-        for v, l in self._labels:
-            if l is lbl:
-                value = v
-                break
-        if value is None:
-            return
-        if self.var.get() == value:
-            # 已选中：悬停不改变（保持稳重）
-            return
-        lbl.configure(bg=self.hov_bg)
-
-        if not entering:
-            # 离开还原
-            lbl.configure(bg=self.nor_bg)
-
-    def _sync(self):
-        cur = self.var.get()
-        for v, lbl in self._labels:
-            if v == cur:
-                lbl.configure(bg=self.sel_bg, fg=self.sel_fg, font=("Segoe UI", 10, "bold"))
-            else:
-                lbl.configure(bg=self.nor_bg, fg=self.nor_fg, font=("Segoe UI", 10, "normal"))
+            rb = ttk.Radiobutton(self.container, text=text, value=value, variable=self.var,
+                                 command=self.command, style=self.STYLE, width=item_width,
+                                 cursor="hand2", takefocus=False)
+            rb.grid(row=0, column=i, sticky="nsew")
+
+    def _configure_style(self):
+        style = ttk.Style(self)
+        # 去掉指示器，只保留填充 + 文本
+        style.layout(self.STYLE, [
+            ("Radiobutton.fill", {"sticky": "nswe", "children": [
+                ("Radiobutton.padding", {"sticky": "nswe", "children": [
+                    ("Radiobutton.label", {"sticky": "nswe"}),
+                ]}),
+            ]}),
+        ])
+        style.configure(self.STYLE, background=self.nor_bg, foreground=self.nor_fg,
+                        font=SEGMENT_FONT_NORMAL, padding=(12, 6), anchor="center")
+        # 已选中：悬停不改变（保持稳重）
+        style.map(self.STYLE,
+                  background=[("selected", self.sel_bg), ("active", self.hov_bg)],
+                  foreground=[("selected", self.sel_fg)],
+                  font=[("selected", SEGMENT_FONT_SELECTED)])
 
 
 class SimRateMonitor:
@@ -227,13 +436,24 @@ class SimRateMonitor:
         self.sim_rate = tk.StringVar(value="-- x")
         self.overlay_size = tk.StringVar(value="l")  # Pain point 2: Default to Large
         self.auto_hide = tk.BooleanVar(value=True)    # Pain point 3: Hide when switched out
+        # Python-level mirrors of the two vars above, read on hot paths and off the Tk thread
+        self._size_cache = self.overlay_size.get()
+        self._auto_hide_cache = self.auto_hide.get()
+        self.auto_hide.trace_add("write", self._on_auto_hide_change)
         self.sim_connect = None
         self.aircraft_requests = None
         self.aircraft_events = None
         self.connected = False
-        self.running = True
+        self._stop_event = threading.Event()  # Stops the worker; wakes it immediately on close
+        # Blocking file / COM / PowerShell work from UI handlers, kept off the Tk thread.
+        # Daemon thread so a hung PowerShell never holds up process exit
+        self._io_queue = queue.Queue()
+        threading.Thread(target=self._io_worker, name="io", daemon=True).start()
         self.overlay_window = None
+        self._overlay_alive = False  # overlay_window holds a Toplevel we still have to destroy
         self.overlay_hidden = False  # Track if overlay is hidden (not destroyed)
+        # The overlay follows sim_rate; every write goes through _on_rate_changed
+        self.sim_rate.trace_add("write", self._on_rate_changed)
         
         # Load saved position from config
         config = load_config()
@@ -244,6 +464,18 @@ class SimRateMonitor:
         self.startup_var = tk.BooleanVar(value=self._check_startup_exists())
         self._last_overlay_visible = False  # Track overlay visibility state
         self._hide_timer_id = None  # For debouncing hide
+        self._pending_move = None  # Latest overlay drag target not yet applied
+        self._config_dirty = False  # overlay_position not yet written to config file
+        self._focus_hook = None  # SetWinEventHook handle; None = fall back to polling
+        self._last_hwnd = None  # Foreground window seen by the last focus check
+        self._title_buf = ctypes.create_unicode_buffer(TITLE_BUF_LEN)  # Reused by GetWindowTextW
+        self._pid_buf = wintypes.DWORD()  # Reused by GetWindowThreadProcessId
+        self._own_pid = os.getpid()
+        self._last_rate_text = None  # Last rate text sent to the UI thread
+        self._last_overlay_color = None  # Current overlay label fg
+        self._last_overlay_text = None  # Current overlay label text
+        self._pending_overlay_text = None  # Latest text waiting for _flush_overlay_text
+        self._overlay_flush_id = None
 
         self.size_configs = {
             "s": {"width": 80, "height": 25, "font_size": 10},
@@ -253,12 +485,21 @@ class SimRateMonitor:
             "xxl": {"width": 250, "height": 85, "font_size": 28},
             "hide": None,
         }
+        self._build_size_specs()
 
-        # 存放 tk.Radiobutton
-        self._size_radios = {}
+        # Speed-based overlay text colors
+        self._color_normal = "#E6EDF3"   # White - normal speed (1x)
+        self._color_slow = "#79C0FF"     # Cyan - slower than normal (0.25, 0.5)
+        self._color_fast = "#FFA657"     # Orange - faster than normal (2, 4, 8, 16)
+        self._color_btn = "#58A6FF"      # Blue for buttons
+        # Sim rates are discrete, so classify the formatted text directly
+        self._rate_color_map = {f"{r:.2f}x": self._rate_color(r) for r in SIM_RATE_STEPS}
 
         self.setup_ui()
+        if not self._install_focus_hook():
+            self._schedule_focus_check()
         self.start_simconnect_thread()
+        self.root.after(CONFIG_FLUSH_INTERVAL_MS, self._flush_config)
 
     def setup_ui(self):
         t = CURRENT_THEME
@@ -311,7 +552,7 @@ class SimRateMonitor:
         ]
         self.size_seg = SegmentedRadio(
             size_frame, self.overlay_size, size_options,
-            theme=t, command=self.on_size_change
+            theme=CURRENT_THEME_NAME, command=self.on_size_change
         )
         self.size_seg.pack(side="left", fill="x", expand=True)
 
@@ -335,187 +576,226 @@ class SimRateMonitor:
                                          command=self.toggle_startup)
         self.cb_startup.pack(anchor="w", pady=2)
 
-    # 选中态：粗体 + accent，未选：常规 + fg
-    def _refresh_size_radio_styles(self):
-        t = CURRENT_THEME
-        selected = self.overlay_size.get()
-        for value, rb in self._size_radios.items():
-            if value == selected:
-                rb.configure(fg=t["accent"], activeforeground=t["accent"],
-                             font=("Segoe UI", 10, "bold"))
-            else:
-                rb.configure(fg=t["fg"], activeforeground=t["fg"],
-                             font=("Segoe UI", 10))
-
     # ===== SimConnect 线程逻辑保持不变 =====
     def start_simconnect_thread(self):
         self.simconnect_thread = threading.Thread(target=self.simconnect_worker, daemon=True)
         self.simconnect_thread.start()
 
+    def _io_worker(self):
+        """Run queued (fn, arg, done) jobs in order; done(error) is posted back to the Tk thread"""
+        while True:
+            fn, arg, done = self._io_queue.get()
+            try:
+                fn(arg)
+                error = None
+            except Exception as e:
+                error = e
+            self._post(done, error)
+
     def simconnect_worker(self):
         logger.info("Starting SimConnect worker thread")
-        while self.running:
+        interval = 0
+        # wait() returns True as soon as on_closing sets the event
+        while not self._stop_event.wait(interval):
             try:
                 if not self.connected:
                     self.connect_to_msfs()
                     if not self.connected:
-                        logger.debug("Connection failed, waiting 3 seconds before retry...")
-                        # Also check window even when not connected
-                        self._check_active_window()
-                    time.sleep(3.0)
+                        if DEBUG_ENABLED: logger.debug("Connection failed, waiting 3 seconds before retry...")
+                    interval = 3.0
                 else:
                     self.update_sim_rate()
-                    self._check_active_window()
-                    time.sleep(0.5)
+                    interval = SIM_RATE_POLL_INTERVAL
             except Exception as e:
                 logger.error(f"SimConnect worker thread error: {type(e).__name__}: {e}")
                 self.handle_disconnect()
-                time.sleep(3.0)
+                interval = 3.0
         logger.info("SimConnect worker thread stopped")
 
+    def _post(self, fn, *args):
+        """Run fn(*args) on the Tk thread; worker threads never touch widgets directly"""
+        if self._stop_event.is_set():
+            return  # Closing: don't queue work behind the teardown
+        try:
+            # 使用 after_idle 而不是 after(0) 来提高响应性
+            self.root.after_idle(fn, *args)
+        except (RuntimeError, tk.TclError):
+            pass  # Tk already gone
+
+    def _install_focus_hook(self):
+        """Subscribe to foreground changes; Tk's mainloop pumps the hook messages"""
+        # Keep a reference to the callback, ctypes doesn't
+        self._win_event_proc = WinEventProcType(self._on_foreground_change)
+        # NULL when the hook can't be set; fall back to polling then
+        self._focus_hook = _SetWinEventHook(
+            EVENT_SYSTEM_FOREGROUND, EVENT_SYSTEM_FOREGROUND, None,
+            self._win_event_proc, 0, 0, WINEVENT_OUTOFCONTEXT)
+        if self._focus_hook:
+            logger.info("Foreground change hook installed")
+        else:
+            logger.warning("Foreground change hook unavailable, polling active window instead")
+        return bool(self._focus_hook)
+
+    def _remove_focus_hook(self):
+        if self._focus_hook:
+            try:
+                _UnhookWinEvent(self._focus_hook)
+            except Exception as e:
+                logger.debug(f"Error removing focus hook: {e}")
+            self._focus_hook = None
+
+    def _schedule_focus_check(self):
+        """Fallback when the hook is unavailable: poll focus on the Tk thread"""
+        self._check_active_window()
+        self.root.after(FOCUS_POLL_INTERVAL_MS, self._schedule_focus_check)
+
+    def _on_foreground_change(self, hWinEventHook, event, hwnd, idObject, idChild, idEventThread, dwmsEventTime):
+        """WinEvent callback, runs while Tk's mainloop dispatches messages"""
+        self.root.after(0, self._check_active_window)
+
+    def _recheck_active_window(self):
+        """Forget the cached foreground window, then run the focus check again"""
+        self._last_hwnd = None
+        self._check_active_window()
+
     def _check_active_window(self):
         """Detect active window to determine if overlay should show"""
         try:
             # Using ctypes to get foreground window title
-            hwnd = ctypes.windll.user32.GetForegroundWindow()
-            length = ctypes.windll.user32.GetWindowTextLengthW(hwnd)
-            buff = ctypes.create_unicode_buffer(length + 1)
-            ctypes.windll.user32.GetWindowTextW(hwnd, buff, length + 1)
-            title = buff.value
+            hwnd = _GetForegroundWindow() or 0  # NULL comes back as None
+            if hwnd == self._last_hwnd:
+                return  # Same window as last time, is_msfs_active is still valid
+            self._last_hwnd = hwnd
+            # Any of our own windows (main window, overlay, dialogs) counts as active
+            # Reused buffer: clear it so a failed lookup (e.g. NULL hwnd) can't keep the last pid
+            self._pid_buf.value = 0
+            is_our_app = (_GetWindowThreadProcessId(hwnd, ctypes.byref(self._pid_buf)) != 0
+                          and self._pid_buf.value == self._own_pid)
             
-            # Check if MSFS or our main app is active
-            is_msfs = "Microsoft Flight Simulator" in title or "FlightSimulator" in title
-            is_our_app = "MSFS Sim Rate Monitor" in title
+            title = ""
+            if not is_our_app:
+                n = _GetWindowTextW(hwnd, self._title_buf, TITLE_BUF_LEN)
+                title = self._title_buf.value if n else ""
             
-            # For overlay: check if title is empty (overlay has no title)
-            # This is a heuristic - empty title + overlay exists = likely our overlay
-            is_overlay = (title == "" and self.overlay_window and not self.overlay_hidden)
-            
-            new_active = is_msfs or is_our_app or is_overlay
+            # Check if MSFS is active
+            is_msfs = _MSFS_TITLE_RE.search(title) is not None
+            new_active = is_msfs or is_our_app
             
             if new_active != self.is_msfs_active:
                 self.is_msfs_active = new_active
-                logger.debug(f"Focus changed: active = {new_active} (title: '{title[:50]}')") 
+                if DEBUG_ENABLED: logger.debug(f"Focus changed: active = {new_active} (title: '{title[:50]}')")
                 
                 if new_active:
-                    # Cancel any pending hide and show immediately
-                    if self._hide_timer_id:
-                        self.root.after_cancel(self._hide_timer_id)
-                        self._hide_timer_id = None
-                    self.root.after(0, self._show_overlay)
+                    # Show immediately (also cancels any pending hide)
+                    self._apply_visibility_state()
                 else:
                     # Debounce hide - delay by 300ms to allow focus to return
                     if not self._hide_timer_id:
-                        self._hide_timer_id = self.root.after(300, self._hide_overlay_debounced)
+                        self._hide_timer_id = self.root.after(300, self._apply_visibility_state)
         except Exception as e:
             logger.debug(f"Error checking active window: {e}")
     
-    def _show_overlay(self):
-        """Show overlay if conditions are met"""
-        if self.overlay_size.get() == "hide":
-            return
-        if not self.connected:
-            return
-        
-        if not self.overlay_window:
-            self.create_overlay()
-            rate = self.sim_rate.get()
-            if rate != "-- x":
-                self._update_overlay_rate(rate)
-        elif self.overlay_hidden:
-            self.overlay_window.deiconify()
-            self.overlay_hidden = False
-    
-    def _hide_overlay_debounced(self):
-        """Hide overlay after debounce delay"""
-        self._hide_timer_id = None
-        
-        # Double check that we should still hide
-        if self.is_msfs_active or not self.auto_hide.get():
-            return  # Don't hide
-        
-        if self.overlay_window and not self.overlay_hidden:
-            self._save_overlay_position()
-            self.overlay_window.withdraw()
-            self.overlay_hidden = True
-
-    def _update_overlay_visibility(self):
-        """Update overlay visibility based on connection and focus state"""
-        if self.overlay_size.get() == "hide":
+    def _apply_visibility_state(self):
+        """Single place that creates, shows, hides or destroys the overlay"""
+        if self._hide_timer_id:
+            # Cancel any pending debounced hide, the state below is authoritative
+            self.root.after_cancel(self._hide_timer_id)
+            self._hide_timer_id = None
+
+        # Python-level snapshot, no Tcl round-trips
+        size, auto_hide = self._size_cache, self._auto_hide_cache
+        connected, active = self.connected, self.is_msfs_active
+
+        if size == "hide":
             if self.overlay_window:
                 self._save_overlay_position()
                 self.destroy_overlay()
-            return
-        
-        # This method is now mainly used for size changes
-        # Show/hide is handled by _show_overlay and _hide_overlay_debounced
-        should_show = self.connected and (self.is_msfs_active or not self.auto_hide.get())
-        
-        if should_show:
-            self._show_overlay()
+        elif connected and (active or not auto_hide):
+            if not self.overlay_window:
+                self.create_overlay()
+                rate = self.sim_rate.get()
+                if rate != "-- x":
+                    self._update_overlay_rate(rate)
+            elif self.overlay_hidden:
+                self.overlay_window.deiconify()
+                self.overlay_hidden = False
         elif self.overlay_window and not self.overlay_hidden:
             self._save_overlay_position()
             self.overlay_window.withdraw()
             self.overlay_hidden = True
-    
+
     def _save_overlay_position(self):
-        """Save current overlay position to memory and config file"""
+        """Save current overlay position to memory; _flush_config writes it to disk"""
         if self.overlay_window:
             try:
                 x = self.overlay_window.winfo_x()
                 y = self.overlay_window.winfo_y()
                 if x >= 0 and y >= 0:  # Valid position
-                    self.overlay_position = (x, y)
-                    config = load_config()
-                    config["overlay_position"] = [x, y]
-                    save_config(config)
+                    if (x, y) != self.overlay_position:
+                        self.overlay_position = (x, y)
+                        self._config_dirty = True
             except:
                 pass
 
+    def _write_config(self):
+        """Write the overlay position to the config file"""
+        config = load_config()
+        config["overlay_position"] = list(self.overlay_position)
+        save_config(config)
+        self._config_dirty = False
+
+    def _flush_config(self):
+        """Periodically write config if the position changed"""
+        if self._config_dirty:
+            self._write_config()
+        self.root.after(CONFIG_FLUSH_INTERVAL_MS, self._flush_config)
+
 
     def connect_to_msfs(self):
         logger.info("Attempting to connect to MSFS...")
         try:
             # Clean up existing connections
             if self.aircraft_requests:
-                logger.debug("Cleaning up existing AircraftRequests instance")
+                if DEBUG_ENABLED: logger.debug("Cleaning up existing AircraftRequests instance")
                 self.aircraft_requests = None
             if self.sim_connect:
-                logger.debug("Cleaning up existing SimConnect instance")
+                if DEBUG_ENABLED: logger.debug("Cleaning up existing SimConnect instance")
                 try: 
                     self.sim_connect.exit()
                 except Exception as e: 
-                    logger.debug(f"Error cleaning up existing SimConnect: {e}")
+                    if DEBUG_ENABLED: logger.debug(f"Error cleaning up existing SimConnect: {e}")
                 self.sim_connect = None
 
-            logger.debug("Creating new SimConnect instance")
+            if DEBUG_ENABLED: logger.debug("Creating new SimConnect instance")
             self.sim_connect = SimConnect(auto_connect=False)
             
-            logger.debug("Calling SimConnect.connect()")
+            if DEBUG_ENABLED: logger.debug("Calling SimConnect.connect()")
             self.sim_connect.connect()
-            logger.debug("SimConnect.connect() completed successfully")
+            if DEBUG_ENABLED: logger.debug("SimConnect.connect() completed successfully")
 
-            logger.debug("Creating AircraftRequests instance with SimConnect")
+            if DEBUG_ENABLED: logger.debug("Creating AircraftRequests instance with SimConnect")
             self.aircraft_requests = AircraftRequests(self.sim_connect)
-            logger.debug("AircraftRequests instance created successfully")
+            if DEBUG_ENABLED: logger.debug("AircraftRequests instance created successfully")
 
-            logger.debug("Creating AircraftEvents instance with SimConnect")
+            if DEBUG_ENABLED: logger.debug("Creating AircraftEvents instance with SimConnect")
             self.aircraft_events = AircraftEvents(self.sim_connect)
-            logger.debug("AircraftEvents instance created successfully")
+            if DEBUG_ENABLED: logger.debug("AircraftEvents instance created successfully")
             
             # Test the connection by trying to get simulation rate
-            logger.debug("Testing connection by requesting simulation rate")
+            if DEBUG_ENABLED: logger.debug("Testing connection by requesting simulation rate")
             test_rate = self.aircraft_requests.get("SIMULATION_RATE")
-            logger.debug(f"Test request result: {test_rate}")
+            if DEBUG_ENABLED: logger.debug(f"Test request result: {test_rate}")
             
             self.connected = True
             logger.success("✅ Successfully connected to MSFS via AircraftRequests")
             # Show overlay immediately on connection (don't wait for focus check)
             self.is_msfs_active = True  # Assume main window is active since user just opened app
-            self.root.after(0, self._show_overlay)
+            self._post(self._apply_visibility_state)
+            # No foreground event may follow, so verify the assumption once
+            self._post(self._recheck_active_window)
         except Exception as e:
             logger.error(f"❌ Failed to connect to MSFS: {type(e).__name__}: {e}")
-            logger.debug(f"Connection error details:", exc_info=True)
+            if DEBUG_ENABLED: logger.opt(exception=True).debug("Connection error details:")
             self.handle_disconnect()
 
     def update_sim_rate(self):
@@ -526,25 +806,32 @@ class SimRateMonitor:
             rate = self.aircraft_requests.get("SIMULATION_RATE")
             if rate is not None and isinstance(rate, (int, float)) and rate >= 0:
                 rate_text = f"{rate:.2f}x"
+                if rate_text == self._last_rate_text:
+                    return  # Unchanged, nothing to redraw
+                self._last_rate_text = rate_text
                 
-                # 使用 after_idle 而不是 after(0) 来提高响应性
-                self.root.after_idle(lambda: self._update_ui_rate(rate_text))
-        except Exception as e:
-            logger.debug(f"Update sim rate error: {e}")
+                self._post(self._update_ui_rate, rate_text)
+        except Exception:
+            # Reported by handle_disconnect, no per-tick debug log
             self.handle_disconnect()
     
     def _update_ui_rate(self, rate_text):
         """在主线程中更新UI"""
         try:
             self.sim_rate.set(rate_text)
-            if self.overlay_window and self.overlay_size.get() != "hide":
-                self.update_overlay(rate_text)
         except Exception as e:
             logger.debug(f"UI update error: {e}")
 
+    def _on_rate_changed(self, *_):
+        """sim_rate write trace: mirror the new rate onto the overlay"""
+        if not self.overlay_window or self._size_cache == "hide":
+            return
+        self.update_overlay(self.sim_rate.get())
+
     def handle_disconnect(self):
         logger.warning("Handling MSFS disconnection")
         self.connected = False
+        self._last_rate_text = None
         if self.aircraft_requests:
             self.aircraft_requests = None
         if self.aircraft_events:
@@ -552,25 +839,24 @@ class SimRateMonitor:
         if self.sim_connect:
             try: 
                 self.sim_connect.exit()
-                logger.debug("SimConnect instance cleaned up")
+                if DEBUG_ENABLED: logger.debug("SimConnect instance cleaned up")
             except Exception as e:
-                logger.debug(f"Error during SimConnect cleanup: {e}")
+                if DEBUG_ENABLED: logger.debug(f"Error during SimConnect cleanup: {e}")
             self.sim_connect = None
-        self.root.after(0, lambda: self.sim_rate.set("-- x"))
-        if self.overlay_window and self.overlay_size.get() != "hide":
-            self.root.after(0, lambda: self.update_overlay("-- x"))
+        self._post(self.sim_rate.set, "-- x")
+        # No foreground / size event has to follow, so withdraw the overlay now
+        self._post(self._apply_visibility_state)
 
     def on_size_change(self):
-        self._refresh_size_radio_styles()
-        selected_size = self.overlay_size.get()
-        if selected_size == "hide":
-            self.destroy_overlay()
-        else:
-            # Destroy and recreate for size change
-            if self.overlay_window:
-                self.destroy_overlay()
-            # Only show if conditions are met
-            self._update_overlay_visibility()
+        self._size_cache = self.overlay_size.get()
+        if self._size_cache != "hide" and self.overlay_window:
+            # Resize the existing overlay in place, no Toplevel rebuild
+            self._resize_overlay()
+        # Only show if conditions are met
+        self._apply_visibility_state()
+
+    def _on_auto_hide_change(self, *_):
+        self._auto_hide_cache = self.auto_hide.get()
 
     def sim_rate_incr(self):
         """Pain point 4: Increase sim rate"""
@@ -597,29 +883,28 @@ class SimRateMonitor:
                 logger.error(f"Error sending SIM_RATE_DECR: {e}")
 
     # ===== Modern Overlay Design v3 (Speed-based colors) =====
+    def _build_size_specs(self):
+        self._size_derived = {k: _derive_size_spec(k, v) for k, v in self.size_configs.items() if v}
+
     def create_overlay(self):
-        if self.overlay_window or self.overlay_size.get() == "hide": return
-        size_config = self.size_configs[self.overlay_size.get()]
-        if size_config is None: return
-        
-        current_size = self.overlay_size.get()
-        base_width, base_height, font_size = size_config["width"], size_config["height"], size_config["font_size"]
-        
-        # Adjust dimensions based on size and whether buttons are shown
-        show_buttons = current_size not in ["s"]  # No buttons for S size
-        width = base_width + (45 if show_buttons else 0)
-        height = base_height
+        current_size = self._size_cache
+        if self.overlay_window or current_size == "hide": return
+        spec = self._size_derived.get(current_size)
+        if spec is None: return
 
         self.overlay_window = tk.Toplevel()
+        self._overlay_alive = True
         self.overlay_window.title("")
         # Use saved position
         x, y = self.overlay_position
-        self.overlay_window.geometry(f"{width}x{height}+{x}+{y}")
+        self.overlay_window.geometry(f"{spec.width}x{spec.height}+{x}+{y}")
         self.overlay_window.resizable(False, False)
         self.overlay_window.overrideredirect(True)
         self.overlay_window.wm_attributes("-topmost", True)
         self.overlay_window.wm_attributes("-alpha", 0.95)
         self.overlay_hidden = False  # Reset hidden flag
+        self._last_overlay_color = None
+        self._last_overlay_text = None
         
         # Modern dark theme colors with speed-based coloring
         bg_color = "#0D1117"
@@ -627,12 +912,6 @@ class SimRateMonitor:
         btn_bg = "#21262D"
         btn_hover = "#30363D"
         
-        # Speed-based text colors
-        self._color_normal = "#E6EDF3"   # White - normal speed (1x)
-        self._color_slow = "#79C0FF"     # Cyan - slower than normal (0.25, 0.5)
-        self._color_fast = "#FFA657"     # Orange - faster than normal (2, 4, 8, 16)
-        self._color_btn = "#58A6FF"      # Blue for buttons
-        
         self.overlay_window.configure(bg=bg_color)
         
         # Main container
@@ -652,41 +931,39 @@ class SimRateMonitor:
         self.overlay_label = tk.Label(
             content, 
             text="1x",
-            font=(OVERLAY_FONT, font_size, "bold"),
+            font=spec.font,
             fg=self._color_normal, 
             bg=bg_color
         )
         self.overlay_label.pack(side="left", expand=True)
         
         # Control buttons (horizontal layout with JetBrains Mono)
-        if show_buttons:
-            btn_frame = tk.Frame(content, bg=bg_color)
-            btn_frame.pack(side="right", padx=(4, 2))
-            
-            # Button font - use JetBrains Mono for consistency
-            btn_font = (OVERLAY_FONT, max(10, font_size // 2))
-            
-            # Minus button (left arrow)
-            self.btn_minus = tk.Label(
-                btn_frame, text="<", 
-                font=btn_font, fg=self._color_btn, bg=btn_bg,
-                padx=3, pady=0, cursor="hand2"
-            )
-            self.btn_minus.pack(side="left", padx=1)
-            self.btn_minus.bind("<Button-1>", lambda e: self.sim_rate_decr())
-            self.btn_minus.bind("<Enter>", lambda e: self.btn_minus.configure(bg=btn_hover))
-            self.btn_minus.bind("<Leave>", lambda e: self.btn_minus.configure(bg=btn_bg))
-            
-            # Plus button (right arrow)
-            self.btn_plus = tk.Label(
-                btn_frame, text=">", 
-                font=btn_font, fg=self._color_btn, bg=btn_bg,
-                padx=3, pady=0, cursor="hand2"
-            )
-            self.btn_plus.pack(side="left", padx=1)
-            self.btn_plus.bind("<Button-1>", lambda e: self.sim_rate_incr())
-            self.btn_plus.bind("<Enter>", lambda e: self.btn_plus.configure(bg=btn_hover))
-            self.btn_plus.bind("<Leave>", lambda e: self.btn_plus.configure(bg=btn_bg))
+        # Always built so a size change only needs to pack/unpack the frame
+        self.overlay_btn_frame = tk.Frame(content, bg=bg_color)
+        if spec.show_buttons:
+            self.overlay_btn_frame.pack(side="right", padx=(4, 2))
+        
+        # Minus button (left arrow)
+        self.btn_minus = tk.Label(
+            self.overlay_btn_frame, text="<", 
+            font=spec.btn_font, fg=self._color_btn, bg=btn_bg,
+            padx=3, pady=0, cursor="hand2"
+        )
+        self.btn_minus.pack(side="left", padx=1)
+        self.btn_minus.bind("<Button-1>", lambda e: self.sim_rate_decr())
+        self.btn_minus.bind("<Enter>", lambda e: self.btn_minus.configure(bg=btn_hover))
+        self.btn_minus.bind("<Leave>", lambda e: self.btn_minus.configure(bg=btn_bg))
+        
+        # Plus button (right arrow)
+        self.btn_plus = tk.Label(
+            self.overlay_btn_frame, text=">", 
+            font=spec.btn_font, fg=self._color_btn, bg=btn_bg,
+            padx=3, pady=0, cursor="hand2"
+        )
+        self.btn_plus.pack(side="left", padx=1)
+        self.btn_plus.bind("<Button-1>", lambda e: self.sim_rate_incr())
+        self.btn_plus.bind("<Enter>", lambda e: self.btn_plus.configure(bg=btn_hover))
+        self.btn_plus.bind("<Leave>", lambda e: self.btn_plus.configure(bg=btn_bg))
         
         # Bind drag events
         for widget in [self.overlay_label, content, self.overlay_container]:
@@ -695,107 +972,161 @@ class SimRateMonitor:
         
         self._overlay_bg = bg_color
 
+    def _resize_overlay(self):
+        """Apply the current size to the existing overlay window"""
+        spec = self._size_derived[self._size_cache]
+        # Size only, keeps wherever the user dragged it
+        self.overlay_window.geometry(f"{spec.width}x{spec.height}")
+        self.overlay_label.config(font=spec.font)
+        self.btn_minus.config(font=spec.btn_font)
+        self.btn_plus.config(font=spec.btn_font)
+        if spec.show_buttons:
+            self.overlay_btn_frame.pack(side="right", padx=(4, 2))
+        else:
+            self.overlay_btn_frame.pack_forget()
+
     def _update_overlay_rate(self, rate_text):
         """Update overlay text and color based on speed"""
         if hasattr(self, "overlay_label") and self.overlay_label:
             self.overlay_label.config(text=rate_text)
+            self._last_overlay_text = rate_text
             
             # Determine color based on rate value
-            try:
-                # Extract numeric value from rate_text (e.g., "2.00x" -> 2.0)
-                rate_val = float(rate_text.replace("x", "").strip())
-                
-                if hasattr(self, "_color_normal"):
-                    if rate_val < 1.0:
-                        color = self._color_slow   # Cyan for slow
-                    elif rate_val > 1.0:
-                        color = self._color_fast   # Orange for fast
-                    else:
-                        color = self._color_normal  # White for normal
-                    
-                    self.overlay_label.config(fg=color)
-            except:
-                pass  # Keep current color if parsing fails
+            color = self._rate_color_map.get(rate_text)
+            if color is None:
+                try:
+                    # Extract numeric value from rate_text (e.g., "2.00x" -> 2.0)
+                    color = self._rate_color(float(rate_text.replace("x", "").strip()))
+                except ValueError:
+                    return  # Keep current color if parsing fails
+            
+            if color != self._last_overlay_color:
+                self.overlay_label.config(fg=color)
+                self._last_overlay_color = color
+
+    def _rate_color(self, rate_val):
+        if rate_val < 1.0:
+            return self._color_slow   # Cyan for slow
+        if rate_val > 1.0:
+            return self._color_fast   # Orange for fast
+        return self._color_normal     # White for normal
 
     # Startup Folder logic
-    def _get_startup_path(self):
-        return os.path.join(os.environ["APPDATA"], r"Microsoft\Windows\Start Menu\Programs\Startup")
+    def _check_startup_exists(self):
+        return os.path.exists(_LNK_PATH)
 
-    def _get_shortcut_path(self):
-        return os.path.join(self._get_startup_path(), "MSFS-SimRateMonitor.lnk")
+    def _create_startup_shortcut(self, lnk):
+        """Create the startup shortcut, falling back to PowerShell; raises OSError on failure"""
+        try:
+            if _create_shortcut(lnk, _STARTUP_TARGET, _STARTUP_ARGS,
+                                _WORKDIR, _STARTUP_TARGET):
+                logger.info(f"Startup shortcut created: {lnk}")
+            else:
+                logger.info(f"Startup shortcut already up to date: {lnk}")
+            return
+        except OSError as e:
+            logger.warning(f"IShellLinkW failed ({e}), falling back to PowerShell")
 
-    def _check_startup_exists(self):
-        return os.path.exists(self._get_shortcut_path())
+        # No cmd.exe layer, no $PROFILE, no interactive host setup
+        argv = ["powershell", "-NoProfile", "-NonInteractive", "-ExecutionPolicy", "Bypass",
+                "-File", _shortcut_script_path(),
+                "-LnkPath", lnk, "-Target", _STARTUP_TARGET, "-Arguments", _STARTUP_ARGS]
+        try:
+            result = subprocess.run(argv, creationflags=CREATE_NO_WINDOW, check=False,
+                                    timeout=SHORTCUT_PS_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            raise OSError(f"PowerShell did not finish within {SHORTCUT_PS_TIMEOUT}s")
+        if result.returncode != 0:
+            raise OSError(f"PowerShell exited with code {result.returncode}")
+        logger.info("Startup shortcut created via PowerShell")
+
+    def _remove_startup_shortcut(self, lnk):
+        try:
+            os.remove(lnk)
+        except FileNotFoundError:
+            return  # Nothing to remove
+        logger.info(f"Startup shortcut removed: {lnk}")
 
     def toggle_startup(self):
-        lnk = self._get_shortcut_path()
-        if self.startup_var.get():
-            # Create shortcut
-            try:
-                import winshell
-                from win32com.client import Dispatch
-                
-                target = sys.executable if not getattr(sys, 'frozen', False) else sys.executable
-                arguments = f'"{os.path.abspath(__file__)}"' if not getattr(sys, 'frozen', False) else ""
-                if "--startup" not in arguments and not getattr(sys, 'frozen', False):
-                    arguments += " --startup"
-                elif getattr(sys, 'frozen', False):
-                    arguments = "--startup"
-                
-                shell = Dispatch('WScript.Shell')
-                shortcut = shell.CreateShortCut(lnk)
-                shortcut.Targetpath = target
-                shortcut.Arguments = arguments
-                shortcut.WorkingDirectory = os.path.dirname(target)
-                shortcut.IconLocation = target
-                shortcut.save()
-                logger.info(f"Startup shortcut created: {lnk}")
-            except ImportError:
-                # Fallback to a simple powershell command to create shortcut if win32com missing
-                target = sys.executable if not getattr(sys, 'frozen', False) else sys.executable
-                args = f'\\"{os.path.abspath(__file__)}\\" --startup' if not getattr(sys, 'frozen', False) else "--startup"
-                ps_cmd = f'$s=(New-Object -ComObject WScript.Shell).CreateShortcut("{lnk}");$s.TargetPath="{target}";$s.Arguments="{args}";$s.Save()'
-                os.system(f'powershell -Command {ps_cmd}')
-                logger.info("Startup shortcut created via PowerShell")
-            except Exception as e:
-                logger.error(f"Failed to create startup shortcut: {e}")
-                messagebox.showerror("Error", f"Failed to create startup shortcut:\n{e}")
-                self.startup_var.set(False)
+        lnk = _LNK_PATH
+        enabled = self.startup_var.get()
+        # Shortcut I/O runs in order on the I/O worker, the result comes back on the Tk thread
+        work = self._create_startup_shortcut if enabled else self._remove_startup_shortcut
+        self._io_queue.put((work, lnk, lambda e: self._on_shortcut_done(e, enabled)))
+
+    def _on_shortcut_done(self, e, enabled):
+        if e is None:
+            return
+        if enabled:
+            logger.error(f"Failed to create startup shortcut: {e}")
+            messagebox.showerror("Error", f"Failed to create startup shortcut:\n{e}")
         else:
-            # Remove shortcut
-            if os.path.exists(lnk):
-                try:
-                    os.remove(lnk)
-                    logger.info(f"Startup shortcut removed: {lnk}")
-                except Exception as e:
-                    logger.error(f"Failed to remove startup shortcut: {e}")
-                    messagebox.showerror("Error", f"Failed to remove shortcut:\n{e}")
-                    self.startup_var.set(True)
+            logger.error(f"Failed to remove startup shortcut: {e}")
+            messagebox.showerror("Error", f"Failed to remove shortcut:\n{e}")
+        self.startup_var.set(not enabled)
 
     def start_move(self, event):
         self.x, self.y = event.x, event.y
+        # Raw Tcl call for the drag, skips the wm_geometry wrapper per move
+        self._tk_call = self.overlay_window.tk.call
 
     def do_move(self, event):
         x = self.overlay_window.winfo_x() + (event.x - self.x)
         y = self.overlay_window.winfo_y() + (event.y - self.y)
-        self.overlay_window.geometry(f"+{x}+{y}")
+        # Coalesce motion events: only the latest target is applied once idle
+        if self._pending_move is None:
+            self.overlay_window.after_idle(self._flush_move)
+        self._pending_move = (x, y)
+
+    def _flush_move(self):
+        pending, self._pending_move = self._pending_move, None
+        if pending and self.overlay_window:
+            x, y = pending
+            self._tk_call("wm", "geometry", self.overlay_window._w, f"+{x}+{y}")
 
     def update_overlay(self, rate_text):
+        """Queue rate_text for the overlay; bursts collapse into one update per idle cycle"""
+        if self._overlay_flush_id is None and rate_text == self._last_overlay_text:
+            return  # Already showing this text
+        self._pending_overlay_text = rate_text
+        if self._overlay_flush_id is None:
+            self._overlay_flush_id = self.root.after_idle(self._flush_overlay_text)
+
+    def _flush_overlay_text(self):
+        self._overlay_flush_id = None
+        rate_text = self._pending_overlay_text
+        if rate_text == self._last_overlay_text:
+            return
         try:
             if self.overlay_window and hasattr(self, "overlay_label"):
-                self.overlay_label.config(text=rate_text)
+                self._update_overlay_rate(rate_text)
         except Exception as e:
             logger.debug(f"Error updating overlay: {e}")
-            if self.overlay_size.get() != "hide":
+            if self._size_cache != "hide":
+                # Drop the stale window first, create_overlay() is a no-op while one is set
+                if self._overlay_alive:
+                    self.destroy_overlay()
                 self.create_overlay()
+                # The rebuilt label starts from the placeholder; unchanged rates won't re-queue it
+                if self.overlay_window:
+                    self._update_overlay_rate(rate_text)
 
     def destroy_overlay(self):
-        if self.overlay_window:
-            self.overlay_window.destroy()
+        if not self._overlay_alive:
             self.overlay_window = None
+            return
+        self._overlay_alive = False
+        try:
+            self.overlay_window.destroy()
+        except tk.TclError:
+            pass  # Window already gone
+        self.overlay_window = None
 
     def on_closing(self):
-        self.running = False
+        self._stop_event.set()
+        # _post 不再排队新回调；先跑完已排队的 idle 回调，再拆除 overlay 与写配置
+        self.root.update_idletasks()
+        self._remove_focus_hook()
         
         # 关闭连接
         if self.aircraft_requests:
@@ -803,18 +1134,36 @@ class SimRateMonitor:
         if self.sim_connect:
             try:
                 self.sim_connect.exit()
-            except: pass
+            except Exception: pass
             self.sim_connect = None
         
-        try: self.destroy_overlay()
-        except: pass
+        try:
+            self._save_overlay_position()
+            self.destroy_overlay()
+        except Exception: pass
+
+        # Persist position on exit
+        self._write_config()
         
-        # 快速退出，不等待线程
-        self.root.quit()
+        # 快速退出，不等待线程（SimConnect / IO 线程均为 daemon）
         self.root.destroy()
 
+    def _init_late(self):
+        """Background thread: register the custom font, then switch the overlay to it"""
+        global OVERLAY_FONT
+        if load_custom_font():
+            OVERLAY_FONT = "JetBrains Mono"
+            self._post(self._apply_overlay_font)
+
+    def _apply_overlay_font(self):
+        self._build_size_specs()
+        if self.overlay_window and self._size_cache != "hide":
+            self._resize_overlay()
+
     def run(self):
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
+        # Defer font registration until the window is up
+        self.root.after_idle(lambda: threading.Thread(target=self._init_late, daemon=True).start())
         self.root.mainloop()
 
 
@@ -822,7 +1171,8 @@ if __name__ == "__main__":
     logger.info("🚀 Starting MSFS Simulation Rate Monitor")
     
     # Handle --startup argument
-    is_startup = "--startup" in sys.argv
+    _ARGV = frozenset(sys.argv[1:])
+    is_startup = "--startup" in _ARGV
     if is_startup:
         logger.info("Starting in silent mode (startup)")
     